@@ -1,86 +1,359 @@
 #!/usr/bin/env python3
 import os
+import re
 import sys
 import csv
+import stat
+import queue
+import logging
 import argparse
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from fnmatch import fnmatch
+import threading
+from fnmatch import translate
+from logging.handlers import MemoryHandler
+
+log = logging.getLogger("size_folder")
 
 def win_long(path: str) -> str:
-    """Enable long-path support on Windows."""
-    if os.name == "nt":
-        path = os.path.normpath(path)
-        if not path.startswith("\\\\?\\"):
-            return "\\\\?\\" + path
+    """
+    Enable long-path support on Windows.
+
+    Prefixing is needed once per root only: scandir on a ``\\\\?\\`` path
+    yields entry paths that keep the prefix, so it propagates down the
+    walk for free. Already-prefixed paths pass through untouched (no
+    re-normalization), which keeps repeated calls cheap and idempotent.
+    """
+    if os.name == "nt" and path[:4] != "\\\\?\\":
+        return "\\\\?\\" + os.path.normpath(path)
     return path
 
+UNITS = ("bytes", "KB", "MB", "GB", "TB", "PB")
+
 def format_size(size_bytes: int) -> str:
-    # Human-readable formatting
-    for unit in ("bytes", "KB", "MB", "GB", "TB", "PB"):
-        if size_bytes < 1024 or unit == "PB":
-            return f"{size_bytes:.0f} {unit}" if unit == "bytes" else f"{size_bytes:.2f} {unit}"
-        size_bytes /= 1024.0
+    # Human-readable formatting; bit_length picks the unit without a division loop
+    if size_bytes < 1024:
+        return f"{size_bytes} bytes"
+    idx = min((size_bytes.bit_length() - 1) // 10, len(UNITS) - 1)
+    return f"{size_bytes / (1 << (idx * 10)):.2f} {UNITS[idx]}"
 
-def should_exclude(name: str, patterns: list[str]) -> bool:
-    return any(fnmatch(name, p) for p in patterns)
+# On POSIX, os.scandir accepts an open directory fd; entry.stat() then runs as
+# fstatat(fd, name) against a short relative name instead of re-resolving the
+# full path in the kernel for every file (what os.fwalk does, kept compatible
+# with the directory queue). Not supported on Windows.
+SCANDIR_TAKES_FD = os.scandir in os.supports_fd
 
-def get_folder_size(
-    root: str,
-    max_depth: int | None = None,
-    exclude_patterns: list[str] | None = None,
-    dedupe_hardlinks: bool = True,
-) -> int:
+
+_GLOB_CHARS = frozenset("*?[")
+
+def compile_excludes(patterns: list[str]) -> tuple[frozenset[str], re.Pattern | None]:
     """
-    Compute total byte size for all files under `root`.
+    Split exclude patterns into a frozenset of literal names (one hash lookup
+    per entry) and a single regex union for patterns that actually use glob
+    metacharacters. Typical excludes (.git, node_modules, .venv) are all
+    literals and never touch the regex engine.
+    """
+    literals = frozenset(p for p in patterns if _GLOB_CHARS.isdisjoint(p))
+    globs = [p for p in patterns if p not in literals]
+    regex = re.compile("|".join("(?:%s)" % translate(p) for p in globs)) if globs else None
+    return literals, regex
+
+class TreeWalker:
+    """
+    Walk one or more directory trees with a shared pool of worker threads.
+
+    Instead of one thread per top-level subfolder (where a single huge
+    subtree can starve the pool while the small ones finish instantly),
+    every *directory* is one unit of work on a shared queue: workers pop
+    a directory, sum its files, and push its child directories back, so
+    threads steal work across subtrees.
     - Does not follow symlinks (avoids loops).
-    - Optionally deduplicates files with multiple hardlinks.
-    - Can limit recursion depth (0 means only `root` itself; 1 includes its direct children; etc.).
+    - Optionally deduplicates files with multiple hardlinks. By default the
+      dedupe scope is each root's own subtree (a hardlink shared by two
+      roots counts once in each); `dedupe_global=True` counts it once
+      overall, attributed to whichever root reaches it first.
+    - Can limit recursion depth (0 means only the root itself; 1 includes
+      its direct children; etc.).
+    - `size_mode="logical"` sums st_size (bytes in the file); "allocated"
+      sums st_blocks * 512 (bytes on disk, what `du` reports — differs for
+      sparse/compressed files and small-file tails). Allocated mode needs
+      st_blocks and falls back to logical where the platform lacks it.
     """
-    root = win_long(root)
-    exclude_patterns = exclude_patterns or []
-    total = 0
-    seen_inodes: set[tuple[int, int]] = set()  # (st_dev, st_ino)
 
-    def _walk(path: str, depth: int) -> None:
-        nonlocal total
+    def __init__(
+        self,
+        threads: int = 1,
+        max_depth: int | None = None,
+        exclude_patterns: list[str] | None = None,
+        dedupe_hardlinks: bool = True,
+        dedupe_global: bool = False,
+        size_mode: str = "logical",
+    ):
+        self.threads = max(1, threads)
+        self.max_depth = max_depth
+        self.exclude_patterns = exclude_patterns or []
+        self.dedupe_hardlinks = dedupe_hardlinks
+        self.dedupe_global = dedupe_global
+        self.size_mode = size_mode
+        self._allocated = size_mode == "allocated" and hasattr(os.stat_result, "st_blocks")
+        self._excl_literals, self._excl_re = compile_excludes(self.exclude_patterns)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._pending = 0  # directories queued or being processed
+        self._totals: dict[str, int] = {}  # root -> bytes
+        # Keys are (st_dev << 64) | st_ino packed into one int (cheaper to
+        # hash and store than a tuple); one set per root, shared when global.
+        self._global_seen: set[int] = set()
+        self._seen_by_root: dict[str, set[int]] = {}
+
+    def add_root(self, root: str) -> None:
+        """
+        Queue `root` as its own subtree; its total is keyed by `root`.
+
+        The Windows long-path prefix is applied here exactly once; child
+        paths are joined from the prefixed parent, so no directory below
+        the root is ever re-normalized.
+        """
+        with self._lock:
+            self._totals[root] = 0
+            self._seen_by_root[root] = self._global_seen if self.dedupe_global else set()
+            self._pending += 1
+        self._queue.put((win_long(root), 0, root))
+
+    def run(self) -> dict[str, int]:
+        """Drain the queue with `threads` workers and return {root: bytes}."""
+        if self.threads == 1:
+            # No point spinning up a pool to feed one consumer: run the
+            # worker loop right here on the calling thread.
+            self._worker()
+            return dict(self._totals)
+        workers = [
+            threading.Thread(target=self._worker, daemon=True)
+            for _ in range(self.threads)
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        return dict(self._totals)
+
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:  # sentinel: all work done
+                return
+            path, depth, root = item
+            self._process_dir(path, depth, root)
+            with self._lock:
+                self._pending -= 1
+                done = self._pending == 0
+            if done:
+                for _ in range(self.threads):
+                    self._queue.put(None)
+
+    def _process_dir(self, path: str, depth: int, root: str) -> None:
+        # The scandir iterator is consumed strictly one entry at a time and
+        # never collected into a list, so peak memory stays flat even for a
+        # directory holding millions of files. Only subdirectories (for the
+        # queue) and multi-link files (for dedupe) are retained, and both are
+        # tiny fractions of a typical listing.
+        #
+        # Hoist everything the inner loop touches into locals: attribute and
+        # closure lookups add up when this runs once per file on large trees.
+        total = 0
+        children: list[str] = []
+        child_add = children.append
+        excl_literals = self._excl_literals
+        excl_re = self._excl_re
+        dedupe = self.dedupe_hardlinks
+        allocated = self._allocated
+        descend = self.max_depth is None or depth < self.max_depth
+        seen = self._seen_by_root[root]
+        lock = self._lock
+        linked: list[tuple[int, int]] = []  # (packed dev/ino key, size) for nlink > 1
+        linked_add = linked.append
+        is_link = stat.S_ISLNK
+        join = os.path.join
+        fd = -1
         try:
-            with os.scandir(path) as it:
+            scan_from: str | int = path
+            if SCANDIR_TAKES_FD:
+                fd = os.open(path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+                scan_from = fd
+            with os.scandir(scan_from) as it:
                 for entry in it:
                     name = entry.name
-                    if should_exclude(name, exclude_patterns):
+                    if name in excl_literals or (
+                        excl_re is not None and excl_re.match(name) is not None
+                    ):
                         continue
-                    try:
-                        if entry.is_symlink():
+                    # is_dir(follow_symlinks=False) uses the d_type cached by
+                    # readdir/FindNextFileW, so it costs no syscall on Linux/Windows
+                    # and is False for symlinks. Only non-directories pay a stat().
+                    if entry.is_dir(follow_symlinks=False):
+                        if descend:
+                            child_add(join(path, entry.name))
+                    else:
+                        st = entry.stat(follow_symlinks=False)
+                        if is_link(st.st_mode):
                             # Skip symlinks entirely to avoid cycles/double counting
                             continue
-                        if entry.is_dir(follow_symlinks=False):
-                            if max_depth is None or depth < max_depth:
-                                _walk(entry.path, depth + 1)
+                        # Only files that actually have extra links can be
+                        # double-counted; st_nlink == 1 (always true on
+                        # FAT/exFAT and most network shares) bypasses the
+                        # seen set entirely. Multi-link files are batched
+                        # and deduped under one lock per directory below.
+                        size = st.st_blocks * 512 if allocated else st.st_size
+                        if dedupe and st.st_nlink > 1:
+                            linked_add(((st.st_dev << 64) | st.st_ino, size))
                         else:
-                            st = entry.stat(follow_symlinks=False)
-                            if dedupe_hardlinks:
-                                key = (st.st_dev, st.st_ino)
-                                if key in seen_inodes:
-                                    continue
-                                seen_inodes.add(key)
-                            total += st.st_size
-                    except Exception as e:
-                        print(f"⚠️ Cannot access {entry.path}: {e}", file=sys.stderr)
+                            total += size
         except Exception as e:
-            print(f"⚠️ Cannot open {path}: {e}", file=sys.stderr)
+            # One handler per directory keeps the per-entry path branchless;
+            # an unreadable entry drops the rest of this directory's listing
+            # but the partial total is still counted.
+            log.warning("⚠️ Cannot read %s: %s", path, e)
+        finally:
+            if fd != -1:
+                os.close(fd)
+        with lock:
+            seen_add = seen.add
+            for key, size in linked:
+                if key not in seen:
+                    seen_add(key)
+                    total += size
+            self._totals[root] += total
+            self._pending += len(children)
+        for child in children:
+            self._queue.put((child, depth + 1, root))
+
 
-    _walk(root, 0)
+def _flat_size(
+    path: str,
+    excl_literals: frozenset[str],
+    excl_re: re.Pattern | None,
+    dedupe: bool,
+    allocated: bool,
+    seen: set[int],
+    children: list[str] | None = None,
+) -> int:
+    """
+    Sum one directory's files in a single scandir pass, collecting
+    subdirectories into `children` when given. Fast path for shallow
+    --max-depth scans where queue/worker setup would dominate the work.
+    """
+    total = 0
+    is_link = stat.S_ISLNK
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                name = entry.name
+                if name in excl_literals or (
+                    excl_re is not None and excl_re.match(name) is not None
+                ):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if children is not None:
+                        children.append(entry.path)
+                    continue
+                st = entry.stat(follow_symlinks=False)
+                if is_link(st.st_mode):
+                    continue
+                if dedupe and st.st_nlink > 1:
+                    key = (st.st_dev << 64) | st.st_ino
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                total += st.st_blocks * 512 if allocated else st.st_size
+    except Exception as e:
+        log.warning("⚠️ Cannot read %s: %s", path, e)
     return total
 
+
+def get_folder_size(
+    root: str,
+    max_depth: int | None = None,
+    exclude_patterns: list[str] | None = None,
+    dedupe_hardlinks: bool = True,
+    threads: int = 1,
+    size_mode: str = "logical",
+) -> int:
+    """Compute total byte size for all files under `root` (see TreeWalker)."""
+    if max_depth is not None and max_depth <= 1:
+        excl_literals, excl_re = compile_excludes(exclude_patterns or [])
+        allocated = size_mode == "allocated" and hasattr(os.stat_result, "st_blocks")
+        seen: set[int] = set()
+        children: list[str] | None = [] if max_depth == 1 else None
+        total = _flat_size(
+            win_long(root), excl_literals, excl_re, dedupe_hardlinks, allocated, seen, children
+        )
+        for child in children or ():
+            total += _flat_size(
+                child, excl_literals, excl_re, dedupe_hardlinks, allocated, seen
+            )
+        return total
+    walker = TreeWalker(
+        threads=threads,
+        max_depth=max_depth,
+        exclude_patterns=exclude_patterns,
+        dedupe_hardlinks=dedupe_hardlinks,
+        size_mode=size_mode,
+    )
+    walker.add_root(root)
+    return walker.run()[root]
+
+NETWORK_FS_TYPES = ("nfs", "cifs", "smb", "fuse.sshfs", "9p", "afs")
+
+def detect_io_profile(root: str) -> str:
+    """Best-effort guess of the storage behind `root`: 'ssd', 'hdd' or 'net'."""
+    if sys.platform.startswith("linux"):
+        try:
+            real = os.path.realpath(root)
+            # Network filesystem? Longest mount-point match in /proc/mounts.
+            mount, fstype = "", ""
+            with open("/proc/mounts", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) >= 3 and real.startswith(parts[1]) and len(parts[1]) >= len(mount):
+                        mount, fstype = parts[1], parts[2]
+            if fstype.startswith(NETWORK_FS_TYPES):
+                return "net"
+            # Rotational flag of the backing block device (partition or disk).
+            dev = os.stat(real).st_dev
+            blk = os.path.realpath(f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}")
+            for candidate in (blk, os.path.dirname(blk)):
+                rot = os.path.join(candidate, "queue", "rotational")
+                if os.path.exists(rot):
+                    with open(rot) as f:
+                        return "hdd" if f.read().strip() == "1" else "ssd"
+        except Exception:
+            pass
+    return "ssd"
+
+def pick_thread_count(root: str, profile: str = "auto") -> int:
+    """
+    Default worker count tuned to the storage: many threads hide latency on
+    network shares but just thrash the head on spinning disks.
+    """
+    if profile == "auto":
+        profile = detect_io_profile(root)
+    cpu = os.cpu_count() or 4
+    if profile == "hdd":
+        return min(8, cpu)
+    if profile == "net":
+        return 32
+    return max(4, cpu * 2)
+
 def list_immediate_subdirs(root: str) -> list[str]:
     root = win_long(root)
     try:
         with os.scandir(root) as it:
+            # A list is fine here: only directories are kept, and roots with
+            # enough immediate subdirs for this to matter are pathological.
+            # The walker's own per-file loop never materializes entries.
             return [e.path for e in it if e.is_dir(follow_symlinks=False)]
     except FileNotFoundError:
         raise
     except Exception as e:
-        print(f"⚠️ Cannot list {root}: {e}", file=sys.stderr)
+        log.warning("⚠️ Cannot list %s: %s", root, e)
         return []
 
 def main():
@@ -91,13 +364,31 @@ def main():
                     help="Max recursion depth relative to each subfolder (e.g., 2). Default: unlimited.")
     ap.add_argument("--exclude", "-x", action="append", default=[],
                     help="Glob patterns to exclude (e.g., -x .git -x node_modules -x '*.tmp'). Can repeat.")
-    ap.add_argument("--threads", type=int, default=max(4, (os.cpu_count() or 4) * 2),
-                    help="Number of worker threads (default: ~2x CPU).")
+    ap.add_argument("--threads", type=int, default=0,
+                    help="Number of worker threads (default: auto, based on --io-profile).")
+    ap.add_argument("--size-mode", choices=("logical", "allocated"), default="logical",
+                    help="'logical' sums file sizes (st_size); 'allocated' sums disk "
+                         "usage (st_blocks*512, like du). Default: logical.")
+    ap.add_argument("--dedup-global", action="store_true",
+                    help="De-dupe hardlinks across all subfolders (default: within each subfolder).")
+    ap.add_argument("--io-profile", choices=("auto", "ssd", "hdd", "net"), default="auto",
+                    help="Storage type behind --root; sets the default thread count "
+                         "(ssd: ~2x CPU, hdd: <=8, net: 32). Default: auto-detect.")
     ap.add_argument("--top", type=int, default=0,
                     help="Show only top-N largest subfolders (0 = show all).")
     ap.add_argument("--csv", metavar="OUT.csv", help="Write results to CSV file as well.")
+    ap.add_argument("--quiet", "-q", action="store_true",
+                    help="Suppress per-directory access warnings.")
     args = ap.parse_args()
 
+    # Batch warnings instead of hitting stderr per unreadable directory:
+    # thousands of EACCES entries on a noisy tree would otherwise stall the
+    # scan on terminal writes. The buffer flushes when full and at exit.
+    warn_buffer = MemoryHandler(capacity=1000, flushLevel=logging.ERROR,
+                                target=logging.StreamHandler(sys.stderr))
+    log.addHandler(warn_buffer)
+    log.setLevel(logging.ERROR if args.quiet else logging.WARNING)
+
     root = os.path.abspath(args.root)
     if not os.path.exists(root):
         print(f"❌ Folder not found: {root}", file=sys.stderr)
@@ -109,51 +400,54 @@ def main():
         return
 
     print(f"📁 Checking sizes in: {root}")
-    results: list[tuple[str, int]] = []
-
-    with ThreadPoolExecutor(max_workers=args.threads) as ex:
-        fut2name = {
-            ex.submit(
-                get_folder_size,
-                sd,
-                max_depth=args.max_depth,
-                exclude_patterns=args.exclude,
-                dedupe_hardlinks=True,
-            ): sd
-            for sd in subdirs
-        }
-        for fut in as_completed(fut2name):
-            sd = fut2name[fut]
-            try:
-                size = fut.result()
-            except Exception as e:
-                print(f"⚠️ Failed on {sd}: {e}", file=sys.stderr)
-                size = 0
-            results.append((sd, size))
+
+    threads = args.threads if args.threads > 0 else pick_thread_count(root, args.io_profile)
+    if len(subdirs) == 1 and args.max_depth == 0:
+        # Exactly one directory will ever be scanned; a pool is pure overhead.
+        threads = 1
+
+    walker = TreeWalker(
+        threads=threads,
+        max_depth=args.max_depth,
+        exclude_patterns=args.exclude,
+        dedupe_hardlinks=True,
+        dedupe_global=args.dedup_global,
+        size_mode=args.size_mode,
+    )
+    for sd in subdirs:
+        walker.add_root(sd)
+    results: list[tuple[str, int]] = list(walker.run().items())
 
     # Sort by size desc
     results.sort(key=lambda x: x[1], reverse=True)
 
+    # Strip and basename once per result; display and CSV both reuse it
+    named = [(os.path.basename(path.rstrip("/\\")), path, size) for path, size in results]
+
     # Optionally trim to top-N
-    display = results[: args.top] if args.top and args.top > 0 else results
+    display = named[: args.top] if args.top and args.top > 0 else named
 
     # Print nicely
-    for path, size in display:
-        folder_name = os.path.basename(path.rstrip("/\\"))
+    for folder_name, _, size in display:
         print(f"📂 {folder_name}: {format_size(size)}")
 
     # CSV export
     if args.csv:
         try:
-            with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            rows = [
+                (folder_name, size, format_size(size), path)
+                for folder_name, path, size in named
+            ]
+            with open(args.csv, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
                 writer = csv.writer(f)
                 writer.writerow(["folder", "bytes", "human_readable", "absolute_path"])
-                for path, size in results:
-                    writer.writerow([os.path.basename(path.rstrip('/\\')), size, format_size(size), path])
+                writer.writerows(rows)
             print(f"💾 Saved CSV: {args.csv}")
         except Exception as e:
             print(f"⚠️ Cannot write CSV {args.csv}: {e}", file=sys.stderr)
 
+    warn_buffer.close()  # flush any buffered warnings
+
 if __name__ == "__main__":
     main()
 
@@ -10,12 +10,14 @@ SizeFolder GUI — PharmApp themed
 import os
 import sys
 import csv
+import array
 import queue
 import platform
 import threading
+import subprocess
+import re
 import traceback
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from fnmatch import fnmatch
+from fnmatch import translate
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
@@ -34,6 +36,10 @@ PHARM_ACCENT2 = "#e76f51"
 IS_MAC = (platform.system() == "Darwin")
 IS_WIN = (platform.system() == "Windows")
 
+# Treeview rows inserted per page; more are paged in as the user scrolls, so a
+# 100k-folder scan never pays 100k Tk inserts up front.
+TREE_PAGE_ROWS = 500
+
 def resource_path(rel: str) -> str:
     """
     Return absolute path to resource, works for dev and PyInstaller.
@@ -45,24 +51,32 @@ def resource_path(rel: str) -> str:
     return os.path.join(base, rel)
 
 def win_long(path: str) -> str:
-    """Enable long-path support on Windows."""
-    if IS_WIN:
-        path = os.path.normpath(path)
-        if not path.startswith("\\\\?\\"):
-            return "\\\\?\\" + path
+    """
+    Enable long-path support on Windows.
+
+    Prefixing happens once per scanned root: scandir keeps the prefix on
+    the entry paths it yields, so it propagates down the walk for free.
+    Already-prefixed paths short-circuit on a 4-char slice compare and
+    skip the normpath call entirely.
+    """
+    if IS_WIN and path[:4] != "\\\\?\\":
+        return "\\\\?\\" + os.path.normpath(path)
     return path
 
-def format_size(size_bytes: int) -> str:
-    """Human-readable size."""
-    units = ("bytes", "KB", "MB", "GB", "TB", "PB")
-    size = float(size_bytes)
-    for u in units:
-        if size < 1024.0 or u == units[-1]:
-            return f"{int(size)} {u}" if u == "bytes" else f"{size:.2f} {u}"
-        size /= 1024.0
+_UNITS = ("bytes", "KB", "MB", "GB", "TB", "PB")
 
-def should_exclude(name: str, patterns: list[str]) -> bool:
-    return any(fnmatch(name, p) for p in patterns)
+def format_size(size_bytes: int) -> str:
+    """Human-readable size; bit_length picks the unit without a division loop."""
+    if size_bytes < 1024:
+        return f"{size_bytes} bytes"
+    idx = min((size_bytes.bit_length() - 1) // 10, len(_UNITS) - 1)
+    return f"{size_bytes / (1 << (idx * 10)):.2f} {_UNITS[idx]}"
+
+def compile_excludes(patterns: list[str]) -> "re.Pattern | None":
+    """Compile glob patterns into one regex union (one C-level match per name)."""
+    if not patterns:
+        return None
+    return re.compile("|".join("(?:%s)" % translate(p) for p in patterns))
 
 def list_immediate_subdirs(root: str) -> list[str]:
     root = win_long(root)
@@ -75,12 +89,137 @@ def list_immediate_subdirs(root: str) -> list[str]:
         traceback.print_exc()
         return []
 
+def parallel_walk(
+    subdirs: list[str],
+    n_threads: int,
+    stop_flag: threading.Event,
+    max_depth: int | None = None,
+    exclude_patterns: list[str] | None = None,
+    dedupe_hardlinks: bool = True,
+    progress=None,
+) -> dict[str, int]:
+    """
+    Size many subtrees at once with a shared pool of worker threads.
+
+    Every *directory* is one unit of work on a shared queue: workers pop a
+    directory, sum its files, and push its child directories back, so all
+    threads stay busy even when one subdir dwarfs the others (the classic
+    straggler with one-future-per-subdir). Totals are attributed to the
+    top-level subdir each directory came from.
+    - No symlink following; optional per-subtree hardlink de-dupe.
+    - max_depth as in get_folder_size; stop_flag drains the queue early.
+    - `progress(done)` is called as each subdir finishes, with the count of
+      fully-scanned subdirs so far.
+    """
+    totals: dict[str, int] = {sd: 0 for sd in subdirs}
+    if not subdirs:
+        return totals
+    excl_re = compile_excludes(exclude_patterns or [])
+    seen_by_root: dict[str, set[int]] = {sd: set() for sd in subdirs}
+    # One stat per subdir up front; files on the same device then dedupe on
+    # the bare inode. Foreign devices (bind mounts crossed mid-tree) pack
+    # (dev << 64) | ino into one int — landing above the 64-bit inode range,
+    # so keys never collide and the set holds a single int object per entry.
+    root_devs: dict[str, int] = {}
+    for sd in subdirs:
+        try:
+            root_devs[sd] = os.stat(win_long(sd)).st_dev
+        except OSError:
+            root_devs[sd] = -1
+    outstanding: dict[str, int] = {sd: 1 for sd in subdirs}  # dirs in flight per subdir
+    lock = threading.Lock()
+    work: queue.Queue = queue.Queue()
+    state = {"pending": len(subdirs), "done_roots": 0}
+    for sd in subdirs:
+        work.put((win_long(sd), 0, sd))
+
+    def _worker():
+        stop = stop_flag.is_set
+        while True:
+            item = work.get()
+            if item is None:  # sentinel: all work done
+                return
+            path, depth, top = item
+            total = 0
+            children: list[tuple[str, int, str]] = []
+            # A stopped scan still drains its bookkeeping so workers terminate.
+            if not stop():
+                seen = seen_by_root[top]
+                root_dev = root_devs[top]
+                try:
+                    with os.scandir(path) as it:
+                        for entry in it:
+                            if excl_re is not None and excl_re.match(entry.name) is not None:
+                                continue
+                            try:
+                                # is_dir/is_file answer from scandir's cached
+                                # d_type where the OS reports it, and both are
+                                # False for symlinks — so links are skipped
+                                # without a separate is_symlink() lstat.
+                                if entry.is_dir(follow_symlinks=False):
+                                    if max_depth is None or depth < max_depth:
+                                        children.append((entry.path, depth + 1, top))
+                                elif not entry.is_file(follow_symlinks=False):
+                                    continue  # symlink, fifo, socket, device…
+                                elif dedupe_hardlinks:
+                                    st = entry.stat(follow_symlinks=False)
+                                    # Only multi-link files can be counted twice;
+                                    # the overwhelmingly common nlink == 1 case
+                                    # skips the tuple, the lock, and the set.
+                                    if st.st_nlink > 1:
+                                        dev = st.st_dev
+                                        key = st.st_ino if dev == root_dev else (dev << 64) | st.st_ino
+                                        with lock:
+                                            if key in seen:
+                                                continue
+                                            seen.add(key)
+                                    total += st.st_size
+                                else:
+                                    # entry.stat() reads scandir's cached data
+                                    # where the OS provides it (free on Windows);
+                                    # with dedupe off the size is all we need.
+                                    total += entry.stat(follow_symlinks=False).st_size
+                            except Exception:
+                                # Keep going; log to stderr to avoid GUI spam
+                                print(f"⚠️ Cannot access {entry.path}", file=sys.stderr)
+                except Exception:
+                    print(f"⚠️ Cannot open {path}", file=sys.stderr)
+            root_done = finished = False
+            with lock:
+                totals[top] += total
+                outstanding[top] += len(children) - 1
+                state["pending"] += len(children) - 1
+                if outstanding[top] == 0:
+                    state["done_roots"] += 1
+                    root_done = True
+                done_roots = state["done_roots"]
+                finished = state["pending"] == 0
+            for child in children:
+                work.put(child)
+            if root_done and progress is not None:
+                progress(done_roots)
+            if finished:
+                for _ in range(max(1, n_threads)):
+                    work.put(None)
+
+    if n_threads <= 1:
+        _worker()  # no pool needed to feed one consumer
+        return totals
+    workers = [threading.Thread(target=_worker, daemon=True) for _ in range(n_threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return totals
+
+
 def get_folder_size(
     root: str,
     stop_flag: threading.Event,
     max_depth: int | None = None,
     exclude_patterns: list[str] | None = None,
     dedupe_hardlinks: bool = True,
+    threads: int = 1,
 ) -> int:
     """
     Compute total bytes for all files under `root`.
@@ -89,45 +228,14 @@ def get_folder_size(
     - Limit recursion depth (0 means only root itself; 1 includes its direct children; etc.)
     - Stop early if stop_flag is set.
     """
-    root = win_long(root)
-    exclude_patterns = exclude_patterns or []
-    total = 0
-    seen_inodes: set[tuple[int, int]] = set()
-
-    def _walk(path: str, depth: int) -> None:
-        nonlocal total
-        if stop_flag.is_set():
-            return
-        try:
-            with os.scandir(path) as it:
-                for entry in it:
-                    if stop_flag.is_set():
-                        return
-                    name = entry.name
-                    if should_exclude(name, exclude_patterns):
-                        continue
-                    try:
-                        if entry.is_symlink():
-                            continue
-                        if entry.is_dir(follow_symlinks=False):
-                            if max_depth is None or depth < max_depth:
-                                _walk(entry.path, depth + 1)
-                        else:
-                            st = entry.stat(follow_symlinks=False)
-                            if dedupe_hardlinks:
-                                key = (st.st_dev, st.st_ino)
-                                if key in seen_inodes:
-                                    continue
-                                seen_inodes.add(key)
-                            total += st.st_size
-                    except Exception:
-                        # Keep going; log to stderr to avoid GUI spam
-                        print(f"⚠️ Cannot access {entry.path}", file=sys.stderr)
-        except Exception:
-            print(f"⚠️ Cannot open {path}", file=sys.stderr)
-
-    _walk(root, 0)
-    return total
+    return parallel_walk(
+        [root],
+        threads,
+        stop_flag,
+        max_depth=max_depth,
+        exclude_patterns=exclude_patterns,
+        dedupe_hardlinks=dedupe_hardlinks,
+    )[root]
 
 
 # ------------------------------
@@ -157,11 +265,21 @@ class SizeFolderApp(tk.Tk):
             pass
         self._init_styles()
 
-        # State
-        self.results: list[tuple[str, int]] = []  # (path, size_bytes)
-        self.filtered_view: list[tuple[str, int]] = []
+        # State. Results are stored as parallel arrays (one string list, one
+        # packed int64 array) instead of a list of tuples: sorting reads the
+        # numeric array directly, filtering walks one list, and a million
+        # rows don't carry a tuple object each.
+        self.result_paths: list[str] = []
+        self.result_sizes = array.array("q")
+        self.view_indices: list[int] = []  # filtered/sorted view into the arrays
+        self._rows_loaded = 0  # rows of view_indices currently in the tree
+        self._filter_keys: list[tuple[str, str]] = []  # (basename.lower, path.lower) per result
+        self._display_rows: list[tuple[str, str, int, str]] = []  # pre-formatted Treeview values
+        self._filter_after: str | None = None  # pending debounced filter callback
         self.stop_flag = threading.Event()
         self.scan_running = False
+        self.csv_running = False
+        self._idle_polls = 0  # consecutive empty _poll_queue passes
         self.queue = queue.Queue()
 
         # Build UI
@@ -256,9 +374,9 @@ class SizeFolderApp(tk.Tk):
 
         ttk.Label(opts, text="Filter:").pack(side="left")
         self.var_filter = tk.StringVar(value="")
-        ent_filter = ttk.Entry(opts, textvariable=self.var_filter, width=24)
-        ent_filter.pack(side="left", padx=(4, 0))
-        ent_filter.bind("<KeyRelease>", lambda e: self.apply_filter())
+        self.ent_filter = ttk.Entry(opts, textvariable=self.var_filter, width=24)
+        self.ent_filter.pack(side="left", padx=(4, 0))
+        self.ent_filter.bind("<KeyRelease>", lambda e: self._schedule_filter())
 
         # Progress
         prog = ttk.Frame(parent)
@@ -273,20 +391,22 @@ class SizeFolderApp(tk.Tk):
         tvf.pack(fill="both", expand=True)
         columns = ("folder", "size_h", "bytes", "path")
         self.tv = ttk.Treeview(tvf, columns=columns, show="headings", selectmode="extended")
-        self.tv.heading("folder", text="Folder", command=lambda: self.sort_by(0, key=lambda r: os.path.basename(r[0]).lower()))
-        self.tv.heading("size_h", text="Size", command=lambda: self.sort_by(1, key=lambda r: r[1], reverse=True))
-        self.tv.heading("bytes", text="Bytes", command=lambda: self.sort_by(1, key=lambda r: r[1], reverse=True))
-        self.tv.heading("path", text="Path", command=lambda: self.sort_by(0, key=lambda r: r[0].lower()))
+        # Name/path sorts read the cached lowercase keys built per result set;
+        # no basename/lower work happens inside the sort itself.
+        self.tv.heading("folder", text="Folder", command=lambda: self.sort_by(0, key=lambda i: self._filter_keys[i][0]))
+        self.tv.heading("size_h", text="Size", command=lambda: self.sort_by(1, key=lambda i: self.result_sizes[i], reverse=True))
+        self.tv.heading("bytes", text="Bytes", command=lambda: self.sort_by(1, key=lambda i: self.result_sizes[i], reverse=True))
+        self.tv.heading("path", text="Path", command=lambda: self.sort_by(0, key=lambda i: self._filter_keys[i][1]))
         self.tv.column("folder", width=220, anchor="w")
         self.tv.column("size_h", width=120, anchor="e")
         self.tv.column("bytes", width=120, anchor="e")
         self.tv.column("path", width=400, anchor="w")
 
-        vsb = ttk.Scrollbar(tvf, orient="vertical", command=self.tv.yview)
+        self.vsb = ttk.Scrollbar(tvf, orient="vertical", command=self.tv.yview)
         hsb = ttk.Scrollbar(tvf, orient="horizontal", command=self.tv.xview)
-        self.tv.configure(yscroll=vsb.set, xscroll=hsb.set)
+        self.tv.configure(yscroll=self._on_tree_scroll, xscroll=hsb.set)
         self.tv.grid(row=0, column=0, sticky="nsew")
-        vsb.grid(row=0, column=1, sticky="ns")
+        self.vsb.grid(row=0, column=1, sticky="ns")
         hsb.grid(row=1, column=0, sticky="ew")
 
         tvf.rowconfigure(0, weight=1)
@@ -391,23 +511,8 @@ Branding
 
     def _focus_filter(self):
         # Move focus to filter entry
-        for w in self.tab_scan.winfo_children():
-            # naive search
-            pass
-        self.focus()  # no-op; we keep it simple
-        # Better: we stored the variable; get widget from options frame:
-        # (We already bound KeyRelease on the entry; here we just try to set focus explicitly.)
-        try:
-            self.tab_scan.children  # ensure attribute exists
-            # Find entry by variable string name
-            for child in self.tab_scan.winfo_children():
-                for sub in child.winfo_children():
-                    if isinstance(sub, ttk.Entry) and sub.cget("textvariable") == str(self.var_filter):
-                        sub.focus_set()
-                        sub.selection_range(0, tk.END)
-                        return
-        except Exception:
-            pass
+        self.ent_filter.focus_set()
+        self.ent_filter.selection_range(0, tk.END)
 
     # -------- Context menu --------
     def _show_ctx_menu(self, event):
@@ -446,13 +551,15 @@ Branding
 
     # -------- Platform helpers --------
     def _open_folder(self, path: str):
+        # Popen with an argv list: no shell fork, no quoting issues with
+        # paths containing quotes/&/spaces, no blocking on the child.
         try:
             if IS_WIN:
                 os.startfile(path)  # type: ignore[attr-defined]
             elif IS_MAC:
-                os.system(f'open "{path}"')
+                subprocess.Popen(["open", path])
             else:
-                os.system(f'xdg-open "{path}"')
+                subprocess.Popen(["xdg-open", path])
         except Exception as e:
             messagebox.showerror("Open Folder", str(e))
 
@@ -460,11 +567,11 @@ Branding
         try:
             if IS_WIN:
                 # Reveal/Select in Explorer
-                os.system(f'explorer /select,"{path}"')
+                subprocess.Popen(["explorer", f"/select,{path}"])
             elif IS_MAC:
-                os.system(f'open -R "{path}"')
+                subprocess.Popen(["open", "-R", path])
             else:
-                os.system(f'xdg-open "{os.path.dirname(path)}"')
+                subprocess.Popen(["xdg-open", os.path.dirname(path)])
         except Exception as e:
             messagebox.showerror("Reveal", str(e))
 
@@ -506,7 +613,8 @@ Branding
         t = threading.Thread(target=self._scan_worker, args=(root,), daemon=True)
         t.start()
         # Start UI poll
-        self.after(100, self._poll_queue)
+        self._idle_polls = 0
+        self.after(20, self._poll_queue)
 
     def on_stop(self):
         if self.scan_running:
@@ -514,7 +622,9 @@ Branding
             self._set_status("Stopping…")
 
     def on_save_csv(self):
-        if not self.results:
+        if self.csv_running:
+            return
+        if not self.result_paths:
             messagebox.showinfo("Save CSV", "No results to save.")
             return
         f = filedialog.asksaveasfilename(
@@ -524,15 +634,36 @@ Branding
         )
         if not f:
             return
+        # Write on a worker thread so a huge export never blocks the UI;
+        # completion comes back through the event queue.
+        self.csv_running = True
+        self.btn_csv.configure(state="disabled")
+        self._set_status("Exporting CSV…")
+        threading.Thread(
+            target=self._csv_worker,
+            args=(f, list(self.result_paths), array.array("q", self.result_sizes)),
+            daemon=True,
+        ).start()
+        if not self.scan_running:
+            self._idle_polls = 0
+            self.after(20, self._poll_queue)
+
+    def _csv_worker(self, path: str, paths: list[str], sizes: "array.array"):
+        def rows():
+            # Stream rows straight into the writer: no materialized copy of
+            # the formatted data, rows hit the (1 MiB-buffered) file as they
+            # are produced.
+            for p, sz in zip(paths, sizes):
+                yield (os.path.basename(p.rstrip("/\\")), sz, format_size(sz), p)
+
         try:
-            with open(f, "w", newline="", encoding="utf-8") as out:
+            with open(path, "w", newline="", encoding="utf-8", buffering=1024 * 1024) as out:
                 w = csv.writer(out)
                 w.writerow(["folder", "bytes", "human_readable", "absolute_path"])
-                for p, sz in self.results:
-                    w.writerow([os.path.basename(p.rstrip("/\\")), sz, format_size(sz), p])
-            self._set_status(f"Saved CSV: {f}")
+                w.writerows(rows())
+            self.queue.put(("csv_done", f"Saved CSV: {path}"))
         except Exception as e:
-            messagebox.showerror("Save CSV", str(e))
+            self.queue.put(("csv_error", str(e)))
 
     # -------- Worker & Queue --------
     def _scan_worker(self, root: str):
@@ -551,67 +682,94 @@ Branding
         n = len(subdirs)
         self.queue.put(("init", n))
 
-        results_local: list[tuple[str, int]] = []
-        # Parallel compute per subdir
+        # Emit at most ~200 progress events per scan; the 100 ms UI poll
+        # cannot show more anyway and queue.put per subdir would flood it.
+        step = max(1, n // 200)
+
+        def report(done: int) -> None:
+            if done % step == 0 or done == n:
+                self.queue.put(("progress", done))
+
+        # One shared directory queue across all subdirs: threads steal work
+        # from whichever subtree still has directories left.
         try:
-            with ThreadPoolExecutor(max_workers=self.threads) as ex:
-                fut_map = {
-                    ex.submit(
-                        get_folder_size,
-                        sd,
-                        self.stop_flag,
-                        max_depth=self.max_depth,
-                        exclude_patterns=self.excludes,
-                        dedupe_hardlinks=self.dedupe,
-                    ): sd for sd in subdirs
-                }
-                done_count = 0
-                for fut in as_completed(fut_map):
-                    sd = fut_map[fut]
-                    try:
-                        size = fut.result()
-                    except Exception:
-                        size = 0
-                    results_local.append((sd, size))
-                    done_count += 1
-                    self.queue.put(("progress", done_count))
-                    if self.stop_flag.is_set():
-                        break
+            totals = parallel_walk(
+                subdirs,
+                self.threads,
+                self.stop_flag,
+                max_depth=self.max_depth,
+                exclude_patterns=self.excludes,
+                dedupe_hardlinks=self.dedupe,
+                progress=report,
+            )
         except Exception as e:
             self.queue.put(("error", str(e)))
+            totals = {}
 
         # Sort by size desc
-        results_local.sort(key=lambda x: x[1], reverse=True)
+        results_local = sorted(totals.items(), key=lambda x: x[1], reverse=True)
         self.queue.put(("results", results_local))
         self.queue.put(("done", None))
 
     def _poll_queue(self):
+        # Drain everything first so a burst of progress events collapses into
+        # a single Tk widget update; only the newest value can be seen anyway.
+        events = []
         try:
             while True:
-                ev, payload = self.queue.get_nowait()
-                if ev == "init":
-                    total = int(payload)
-                    self.pb.configure(maximum=total, value=0)
-                elif ev == "progress":
-                    v = int(payload)
-                    self.pb.configure(value=v)
-                    self._set_status(f"Scanning… {int(self.pb['value'])}/{int(self.pb['maximum'])}")
-                elif ev == "results":
-                    self.results = payload or []
-                    self.apply_filter(refresh_tree=True)
-                    self.btn_csv.configure(state="normal" if self.results else "disabled")
-                elif ev == "error":
-                    messagebox.showerror("Error", str(payload))
-                elif ev == "done":
-                    self.scan_running = False
-                    self.btn_scan.configure(state="normal")
-                    self.btn_stop.configure(state="disabled")
-                    self._set_status("Done." if not self.stop_flag.is_set() else "Stopped.")
+                events.append(self.queue.get_nowait())
         except queue.Empty:
             pass
 
-        if self.scan_running:
-            self.after(100, self._poll_queue)
+        last_progress = None
+        saw_done = False
+        for ev, payload in events:
+            if ev == "progress":
+                last_progress = int(payload)
+            elif ev == "init":
+                total = int(payload)
+                self.pb.configure(maximum=total, value=0)
+            elif ev == "results":
+                rows = payload or []
+                self.result_paths = [p for p, _ in rows]
+                self.result_sizes = array.array("q", (sz for _, sz in rows))
+                self._rebuild_filter_keys()
+                self._rebuild_display_rows()
+                self.apply_filter(refresh_tree=True)
+                self.btn_csv.configure(state="normal" if self.result_paths else "disabled")
+            elif ev == "error":
+                messagebox.showerror("Error", str(payload))
+            elif ev == "done":
+                saw_done = True
+                self.scan_running = False
+                self.btn_scan.configure(state="normal")
+                self.btn_stop.configure(state="disabled")
+            elif ev == "csv_done":
+                self.csv_running = False
+                self.btn_csv.configure(state="normal")
+                self._set_status(str(payload))
+            elif ev == "csv_error":
+                self.csv_running = False
+                self.btn_csv.configure(state="normal")
+                messagebox.showerror("Save CSV", str(payload))
+        if last_progress is not None:
+            self.pb.configure(value=last_progress)
+            if not saw_done:
+                self._set_status(f"Scanning… {last_progress}/{int(self.pb['maximum'])}")
+        if saw_done:
+            self._set_status("Done." if not self.stop_flag.is_set() else "Stopped.")
+
+        if self.scan_running or self.csv_running:
+            # Adaptive cadence: chase a busy queue at 20 ms so the progress
+            # bar feels live, then back off to 200 ms once a few consecutive
+            # polls come up empty, halving idle wakeups.
+            if events:
+                self._idle_polls = 0
+                delay = 20
+            else:
+                self._idle_polls += 1
+                delay = 200 if self._idle_polls >= 5 else 100
+            self.after(delay, self._poll_queue)
 
     # -------- Helpers --------
     def _set_status(self, msg: str):
@@ -620,35 +778,84 @@ Branding
     def _clear_results(self):
         for iid in self.tv.get_children():
             self.tv.delete(iid)
-        self.results = []
-        self.filtered_view = []
+        self.result_paths = []
+        self.result_sizes = array.array("q")
+        self.view_indices = []
+        self._filter_keys = []
+        self._display_rows = []
+        self._rows_loaded = 0
         self.pb.configure(value=0, maximum=100)
         self._set_status("Ready.")
 
+    def _rebuild_filter_keys(self):
+        # Lowercased keys are pure functions of the paths; computing them once
+        # per result set keeps keystroke filtering allocation-free and gives
+        # the Folder/Path heading sorts ready-made comparison keys.
+        self._filter_keys = [
+            (os.path.basename(p).lower(), p.lower()) for p in self.result_paths
+        ]
+
+    def _rebuild_display_rows(self):
+        # The Treeview values never change after a scan; formatting them once
+        # here means sorts and filters only shuffle indices into this list.
+        self._display_rows = [
+            (os.path.basename(p.rstrip("/\\")), format_size(sz), sz, p)
+            for p, sz in zip(self.result_paths, self.result_sizes)
+        ]
+
+    def _schedule_filter(self):
+        # Debounce: run one filter pass when typing pauses, not per keystroke.
+        if self._filter_after is not None:
+            self.after_cancel(self._filter_after)
+        self._filter_after = self.after(150, self._run_filter)
+
+    def _run_filter(self):
+        self._filter_after = None
+        self.apply_filter()
+
     def apply_filter(self, refresh_tree: bool = False):
         q = self.var_filter.get().strip().lower()
-        data = self.results
+        n = len(self.result_paths)
         if q:
-            data = [(p, sz) for (p, sz) in self.results if q in os.path.basename(p).lower() or q in p.lower()]
+            if len(self._filter_keys) != n:
+                self._rebuild_filter_keys()
+            keys = self._filter_keys
+            indices = [i for i in range(n) if q in keys[i][0] or q in keys[i][1]]
+        else:
+            indices = list(range(n))
         # Trim top N if needed (but keep full data for CSV)
         top_n = self.top_n if hasattr(self, "top_n") else 0
-        view = data[: top_n] if top_n and top_n > 0 else data
-        self.filtered_view = view
+        self.view_indices = indices[:top_n] if top_n and top_n > 0 else indices
         self._reload_tree()
 
+    def _on_tree_scroll(self, lo, hi):
+        # Forward to the scrollbar, then page in more rows near the bottom.
+        self.vsb.set(lo, hi)
+        if float(hi) > 0.9 and self._rows_loaded < len(self.view_indices):
+            self._load_more_rows()
+
+    def _load_more_rows(self):
+        view = self.view_indices
+        start = self._rows_loaded
+        end = min(start + TREE_PAGE_ROWS, len(view))
+        insert = self.tv.insert
+        rows = self._display_rows
+        for i in view[start:end]:
+            insert("", "end", values=rows[i])
+        self._rows_loaded = end
+
     def _reload_tree(self):
         self.tv.delete(*self.tv.get_children())
-        for p, sz in self.filtered_view:
-            folder_name = os.path.basename(p.rstrip("/\\"))
-            self.tv.insert("", "end", values=(folder_name, format_size(sz), sz, p))
+        self._rows_loaded = 0
+        self._load_more_rows()
 
     def sort_by(self, column_index: int, key, reverse: bool = False):
         """
         column_index: 0 for path, 1 for size
-        key: callable mapping (p, sz)-> comparable
+        key: callable mapping a result index -> comparable
         """
-        # Sort underlying filtered_view
-        self.filtered_view.sort(key=key, reverse=reverse)
+        # Sort the index view; the parallel arrays themselves never move
+        self.view_indices.sort(key=key, reverse=reverse)
         self._reload_tree()
 
 # ------------------------------